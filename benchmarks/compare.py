@@ -0,0 +1,90 @@
+"""
+Сравнение двух JSON-отчётов benchmarks.pipeline (например, двух коммитов).
+
+Пример:
+    python -m benchmarks.compare benchmarks/results/base.json benchmarks/results/new.json --threshold 0.15
+
+Код возврата 1, если время какого-либо шага выросло больше порога
+или recall@k упал больше чем на --recall-drop.
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional
+
+
+def _load(path: str) -> Dict:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _runs_by_size(report: Dict) -> Dict[int, Dict]:
+    return {run['articles']: run for run in report.get('runs', [])}
+
+
+def _delta(old: Optional[float], new: Optional[float]) -> Optional[float]:
+    if old is None or new is None or old == 0:
+        return None
+    return (new - old) / old
+
+
+def _fmt_delta(delta: Optional[float]) -> str:
+    return "    n/a" if delta is None else f"{delta * 100:+6.1f}%"
+
+
+def compare(base: Dict, new: Dict, threshold: float, recall_drop: float) -> List[str]:
+    """Печатает таблицу сравнения и возвращает список найденных регрессий."""
+    regressions = []
+    base_runs = _runs_by_size(base)
+    new_runs = _runs_by_size(new)
+
+    print(f"База:  {base['meta'].get('commit')}  ({base['meta'].get('timestamp')})")
+    print(f"Новый: {new['meta'].get('commit')}  ({new['meta'].get('timestamp')})")
+
+    for size in sorted(set(base_runs) & set(new_runs)):
+        b_run, n_run = base_runs[size], new_runs[size]
+        print(f"\n=== {size} статей ===")
+        print(f"{'шаг':<12}{'время, с':>22}{'Δ':>9}{'items/s':>24}{'Δ':>9}{'peak RSS, МБ':>24}{'Δ':>9}")
+        for stage in [s for s in b_run['stages'] if s in n_run['stages']]:
+            b, n = b_run['stages'][stage], n_run['stages'][stage]
+            wall_delta = _delta(b['wall_s'], n['wall_s'])
+            tput_delta = _delta(b.get('throughput_per_s'), n.get('throughput_per_s'))
+            rss_delta = _delta(b.get('peak_rss_mb'), n.get('peak_rss_mb'))
+            print(f"{stage:<12}"
+                  f"{b['wall_s']:>10.2f} -> {n['wall_s']:>8.2f}{_fmt_delta(wall_delta):>9}"
+                  f"{b.get('throughput_per_s') or 0:>11.1f} -> {n.get('throughput_per_s') or 0:>9.1f}{_fmt_delta(tput_delta):>9}"
+                  f"{b.get('peak_rss_mb') or 0:>11.1f} -> {n.get('peak_rss_mb') or 0:>9.1f}{_fmt_delta(rss_delta):>9}")
+            if wall_delta is not None and wall_delta > threshold:
+                regressions.append(f"{size} статей / {stage}: время +{wall_delta * 100:.1f}% (порог {threshold * 100:.0f}%)")
+
+        b_recall = (b_run.get('retrieval') or {}).get('recall_at_k')
+        n_recall = (n_run.get('retrieval') or {}).get('recall_at_k')
+        if b_recall is not None and n_recall is not None:
+            print(f"recall@{n_run['retrieval']['k']}: {b_recall:.3f} -> {n_recall:.3f}")
+            if b_recall - n_recall > recall_drop:
+                regressions.append(f"{size} статей: recall упал {b_recall:.3f} -> {n_recall:.3f}")
+
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Сравнение отчётов бенчмарка конвейера')
+    parser.add_argument('base', help='Базовый отчёт')
+    parser.add_argument('new', help='Новый отчёт')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Допустимый относительный рост времени шага (0.10 = 10%%)')
+    parser.add_argument('--recall-drop', type=float, default=0.02,
+                        help='Допустимое абсолютное падение recall@k')
+    args = parser.parse_args(argv)
+
+    regressions = compare(_load(args.base), _load(args.new), args.threshold, args.recall_drop)
+    if regressions:
+        print("\nРЕГРЕССИИ:")
+        for r in regressions:
+            print(f"  - {r}")
+        sys.exit(1)
+    print("\nРегрессий не обнаружено.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+import os
+import random
+import threading
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple
+
+# Словари для генерации синтетических статей. Каждая статья получает уникальный
+# "предмет" (прилагательное + технология + кодовое имя + город) и маркер REF-xxxxxx,
+# по которому потом проверяется, попала ли статья в контекст RAG.
+ADJECTIVES = [
+    "autonomous", "quantum", "neuromorphic", "federated", "generative", "photonic",
+    "biodegradable", "distributed", "self-healing", "low-power", "edge", "synthetic",
+    "reinforcement", "multimodal", "privacy-preserving", "open-source",
+]
+TECHNOLOGIES = [
+    "drone fleet", "battery cell", "language model", "gene therapy", "solar panel",
+    "chip design", "robot arm", "satellite network", "vision system", "data center",
+    "vaccine platform", "search engine", "smart grid", "exoskeleton", "3-D printer",
+    "fusion reactor", "sensor mesh", "trading bot", "translation service", "wind turbine",
+]
+CITIES = [
+    "Berlin", "Boston", "Kazan", "Lagos", "Lima", "Nairobi", "Osaka", "Oslo",
+    "Perth", "Porto", "Quito", "Seoul", "Tallinn", "Tbilisi", "Toronto", "Zurich",
+]
+SYLLABLES = [
+    "ka", "lo", "mi", "ra", "zu", "ne", "to", "vi", "sa", "po",
+    "ke", "du", "ri", "fa", "mo", "te", "ga", "bi", "lu", "xo",
+]
+FILLER = [
+    "Researchers say the approach could reduce costs over the next decade.",
+    "Investors have been cautious, citing regulatory uncertainty in several markets.",
+    "The team published its results after two years of field trials.",
+    "Critics argue that the benefits are still hard to measure at scale.",
+    "Early adopters report mixed results depending on the deployment environment.",
+    "Several competitors are working on similar systems with different trade-offs.",
+    "The company plans to open the platform to outside developers next year.",
+    "Analysts expect the market for such products to grow steadily.",
+]
+
+
+def article_codename(i: int, length: int = 4) -> str:
+    """Кодовое имя из слогов: номер статьи в системе счисления по основанию len(SYLLABLES)."""
+    parts = []
+    for _ in range(length):
+        i, rem = divmod(i, len(SYLLABLES))
+        parts.append(SYLLABLES[rem])
+    return "".join(parts).capitalize()
+
+
+def article_subject(i: int) -> str:
+    """Детерминированно строит уникальный (до 160k статей) предмет статьи по её номеру."""
+    adj = ADJECTIVES[i % len(ADJECTIVES)]
+    tech = TECHNOLOGIES[(i // len(ADJECTIVES)) % len(TECHNOLOGIES)]
+    city = CITIES[(i // (len(ADJECTIVES) * len(TECHNOLOGIES))) % len(CITIES)]
+    return f"{adj} {tech} {article_codename(i)} from {city}"
+
+
+def article_marker(i: int) -> str:
+    return f"REF-{i:06d}"
+
+
+def make_article(i: int, paragraphs: int = 4, seed: int = 0) -> Tuple[str, str]:
+    """
+    Генерирует синтетическую статью.
+
+    Returns:
+        Кортеж (заголовок, текст). Ключевой факт с маркером стоит в первом абзаце.
+    """
+    rng = random.Random(seed * 1_000_003 + i)
+    subject = article_subject(i)
+    title = f"Synthetic article {i:06d}: the {subject}"
+    body = [
+        f"The {subject} was unveiled this week. Its internal reference code is "
+        f"{article_marker(i)}, and the engineers behind the {subject} say it is ready for pilots."
+    ]
+    for _ in range(paragraphs - 1):
+        body.append(" ".join(rng.sample(FILLER, 3)))
+    return title, "\n\n".join(body)
+
+
+def make_query(i: int) -> str:
+    return f"What did the engineers say about the {article_subject(i)}?"
+
+
+def write_raw_corpus(output_dir: str, n_articles: int, seed: int = 0) -> int:
+    """
+    Пишет корпус прямо в data/raw-формате (как extract_and_save_article),
+    минуя скрейпинг. Используется, когда шаг scrape исключён из прогона.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    for i in range(n_articles):
+        title, text = make_article(i, seed=seed)
+        with open(os.path.join(output_dir, f"article_{i:06d}.txt"), 'w', encoding='utf-8') as f:
+            f.write(f"Title: {title}\n")
+            f.write(f"URL: http://fixture.local/articles/{i:06d}.html\n\n")
+            f.write(text)
+    return n_articles
+
+
+# --- HTTP-фикстура для шага scrape ---
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    def __init__(self, *args, n_articles: int, seed: int, **kwargs):
+        self.n_articles = n_articles
+        self.seed = seed
+        super().__init__(*args, **kwargs)
+
+    def _send(self, body: str, content_type: str, status: int = 200):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        host = f"http://{self.headers.get('Host')}"
+        if self.path == '/sitemap.xml':
+            urls = "".join(
+                f"<url><loc>{host}/articles/{i:06d}.html</loc></url>"
+                for i in range(self.n_articles)
+            )
+            self._send(
+                '<?xml version="1.0" encoding="UTF-8"?>'
+                f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>',
+                'application/xml; charset=utf-8',
+            )
+            return
+
+        if self.path.startswith('/articles/') and self.path.endswith('.html'):
+            try:
+                i = int(self.path[len('/articles/'):-len('.html')])
+            except ValueError:
+                i = -1
+            if 0 <= i < self.n_articles:
+                title, text = make_article(i, seed=self.seed)
+                paragraphs = "".join(f"<p>{p}</p>" for p in text.split("\n\n"))
+                self._send(
+                    f"<html><head><title>{title}</title></head>"
+                    f"<body><article><h1>{title}</h1>{paragraphs}</article></body></html>",
+                    'text/html; charset=utf-8',
+                )
+                return
+
+        self._send("not found", 'text/plain', status=404)
+
+    def log_message(self, format, *args):
+        # Не засоряем вывод бенчмарка access-логом
+        pass
+
+
+class FixtureServer:
+    """Локальный HTTP-сервер с сайтмапом и синтетическими статьями."""
+
+    def __init__(self, n_articles: int, seed: int = 0, host: str = '127.0.0.1', port: int = 0):
+        handler = partial(_FixtureHandler, n_articles=n_articles, seed=seed)
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def sitemap_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/sitemap.xml"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# --- Заглушки внешних сервисов для шага rag ---
+
+class StubSearch:
+    """Заглушка GoogleSerperAPIWrapper: возвращает фиксированный текст без маркеров."""
+
+    def __init__(self, text: str = "Web search is stubbed out in benchmarks."):
+        self.text = text
+        self.calls = 0
+
+    def run(self, query: str) -> str:
+        self.calls += 1
+        return self.text
+
+
+class StubLLM:
+    """Заглушка HuggingFaceEndpoint: запоминает промпты, отвечает фиксированной строкой."""
+
+    repo_id = "stub-llm"
+
+    def __init__(self, answer: str = "Stub answer."):
+        self.answer = answer
+        self.prompts: List[str] = []
+
+    def invoke(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        return self.answer
@@ -0,0 +1,285 @@
+"""
+Сквозной бенчмарк конвейера scrape -> preprocess -> index -> rag на синтетических корпусах.
+
+Каждый шаг запускается в отдельном (spawn) процессе, поэтому peak RSS в отчёте
+относится именно к этому шагу, а не накапливается по всему прогону. Шаги обмениваются
+данными через файловую систему, как и в main.py.
+
+Пример:
+    python -m benchmarks.pipeline --sizes 1000 10000 --output benchmarks/results/report.json
+    python -m benchmarks.compare benchmarks/results/base.json benchmarks/results/report.json
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from benchmarks.fixtures import (
+    FixtureServer, StubLLM, StubSearch,
+    article_marker, make_query, write_raw_corpus,
+)
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+STAGES = ['scrape', 'preprocess', 'index', 'rag']
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+
+def _peak_rss_mb() -> float:
+    """Пиковый RSS текущего процесса в МБ (ru_maxrss: КБ на Linux, байты на macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+@contextlib.contextmanager
+def _maybe_quiet(verbose: bool):
+    """Глушит stdout шагов конвейера: на 100k статей отладочные print'ы занимают гигабайты."""
+    if verbose:
+        yield
+        return
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def _count_files(path: str) -> int:
+    return len(os.listdir(path)) if os.path.isdir(path) else 0
+
+
+# --- Шаги (выполняются в дочерних процессах) ---
+
+def _run_scrape(workdir: str, n_articles: int, sitemap_url: str, verbose: bool) -> Dict:
+    from scraper.base_scraper import scrape_articles_from_site
+
+    raw_dir = os.path.join(workdir, 'raw')
+    start = time.perf_counter()
+    with _maybe_quiet(verbose):
+        scrape_articles_from_site(
+            output_dir=raw_dir,
+            sitemap_url=sitemap_url,
+            delay_between_articles=0,
+            limit=n_articles,
+        )
+    wall = time.perf_counter() - start
+    return {'wall_s': wall, 'items': _count_files(raw_dir), 'peak_rss_mb': _peak_rss_mb()}
+
+
+def _run_preprocess(workdir: str, verbose: bool) -> Dict:
+    from main import step_preprocess
+
+    raw_dir = os.path.join(workdir, 'raw')
+    proc_dir = os.path.join(workdir, 'processed')
+    start = time.perf_counter()
+    with _maybe_quiet(verbose):
+        step_preprocess(raw_dir=raw_dir, proc_dir=proc_dir)
+    wall = time.perf_counter() - start
+    return {
+        'wall_s': wall,
+        'items': _count_files(raw_dir),
+        'chunks': _count_files(proc_dir),
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def _run_index(workdir: str, verbose: bool) -> Dict:
+    from main import step_index
+
+    proc_dir = os.path.join(workdir, 'processed')
+    index_path = os.path.join(workdir, 'indexes', 'faiss.index')
+    start = time.perf_counter()
+    with _maybe_quiet(verbose):
+        step_index(proc_dir=proc_dir, index_path=index_path)
+    wall = time.perf_counter() - start
+    return {
+        'wall_s': wall,
+        'items': _count_files(proc_dir),
+        'index_bytes': os.path.getsize(index_path),
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def _run_rag(workdir: str, n_articles: int, n_queries: int, verbose: bool) -> Dict:
+    # Пустые значения не перезаписываются load_dotenv() из rag_agent, поэтому
+    # агент не пойдёт ни в HF Hub, ни в Serper; ниже подставляем заглушки.
+    os.environ['HUGGINGFACEHUB_API_TOKEN'] = ''
+    os.environ['HF_TOKEN'] = ''
+    os.environ['SERPER_API_KEY'] = ''
+
+    from configs import load_config
+    from indexing.faiss_indexer import FaissIndexer
+    from rag_integration.metrics import Metrics
+    from rag_integration.rag_agent import RAGAgent
+
+    cfg = load_config()
+    index_path = os.path.join(workdir, 'indexes', 'faiss.index')
+    with _maybe_quiet(verbose):
+        setup_start = time.perf_counter()
+        indexer = FaissIndexer()
+        indexer.load(index_path)
+        agent = RAGAgent(
+            indexer=indexer,
+            embed_model_name=cfg['rag']['embedding_model_name'],
+            llm_model_name=cfg['rag']['llm_model_name'],
+            hf_token=None,
+            top_k=cfg['rag']['top_k'],
+            metrics=Metrics(),
+        )
+        agent.llm = StubLLM()
+        agent.search_wrapper = StubSearch()
+        setup_wall = time.perf_counter() - setup_start
+
+        # Запросы равномерно покрывают корпус
+        step = max(1, n_articles // n_queries)
+        targets = list(range(0, n_articles, step))[:n_queries]
+        latencies: List[float] = []
+        hits = 0
+        start = time.perf_counter()
+        for i in targets:
+            n_prompts = len(agent.llm.prompts)
+            q_start = time.perf_counter()
+            agent.ask(make_query(i))
+            latencies.append(time.perf_counter() - q_start)
+            # Если контекст пуст, ask() не доходит до LLM и новых промптов нет
+            if len(agent.llm.prompts) > n_prompts and article_marker(i) in agent.llm.prompts[-1]:
+                hits += 1
+        wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'wall_s': wall,
+        'setup_s': setup_wall,
+        'items': len(targets),
+        'latency_p50_s': latencies[len(latencies) // 2] if latencies else None,
+        'latency_p95_s': latencies[int(len(latencies) * 0.95)] if latencies else None,
+        'peak_rss_mb': _peak_rss_mb(),
+        # Разбивка времени ask() по стадиям из инструментации RAGAgent
+        'ask_stages': {
+            name: value for name, value in agent.metrics.summary().items()
+            if name.startswith('rag_stage_duration_seconds')
+        },
+        'retrieval': {
+            'k': agent.top_k,
+            'queries': len(targets),
+            'recall_at_k': hits / len(targets) if targets else None,
+        },
+    }
+
+
+# --- Оркестрация ---
+
+def _in_child(ctx, func, *args) -> Dict:
+    """Запускает шаг в свежем процессе, чтобы изолировать peak RSS и импорты."""
+    with ctx.Pool(processes=1) as pool:
+        return pool.apply(func, args)
+
+
+def _with_throughput(result: Dict) -> Dict:
+    wall = result.get('wall_s') or 0
+    result['throughput_per_s'] = result['items'] / wall if wall > 0 else None
+    return result
+
+
+def run_size(n_articles: int, stages: List[str], n_queries: int, seed: int,
+             keep_workdir: bool, verbose: bool) -> Dict:
+    """Прогоняет выбранные шаги конвейера на корпусе из n_articles статей."""
+    ctx = multiprocessing.get_context('spawn')
+    workdir = tempfile.mkdtemp(prefix=f'rag_bench_{n_articles}_')
+    results: Dict[str, Dict] = {}
+    print(f"\n[Bench] Корпус: {n_articles} статей | Шаги: {', '.join(stages)} | Рабочая папка: {workdir}")
+    try:
+        if 'scrape' in stages:
+            with FixtureServer(n_articles, seed=seed) as server:
+                results['scrape'] = _in_child(ctx, _run_scrape, workdir, n_articles, server.sitemap_url, verbose)
+        else:
+            write_raw_corpus(os.path.join(workdir, 'raw'), n_articles, seed=seed)
+        if 'preprocess' in stages:
+            results['preprocess'] = _in_child(ctx, _run_preprocess, workdir, verbose)
+        if 'index' in stages:
+            results['index'] = _in_child(ctx, _run_index, workdir, verbose)
+        if 'rag' in stages:
+            results['rag'] = _in_child(ctx, _run_rag, workdir, n_articles, n_queries, verbose)
+    finally:
+        if not keep_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    run = {'articles': n_articles, 'stages': {}}
+    for stage, result in results.items():
+        retrieval = result.pop('retrieval', None)
+        if retrieval is not None:
+            run['retrieval'] = retrieval
+        run['stages'][stage] = _with_throughput(result)
+        print(f"[Bench] {stage:<10} {result['wall_s']:9.2f} s | "
+              f"{result['throughput_per_s'] or 0:10.1f} items/s | peak RSS {result['peak_rss_mb']:8.1f} MB")
+    if 'retrieval' in run:
+        print(f"[Bench] recall@{run['retrieval']['k']}: {run['retrieval']['recall_at_k']:.3f} "
+              f"({run['retrieval']['queries']} запросов)")
+    return run
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Бенчмарк конвейера RAG на синтетических корпусах')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Размеры корпусов (количество статей)')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES,
+                        help='Какие шаги измерять (без scrape корпус пишется сразу в raw)')
+    parser.add_argument('--queries', type=int, default=50, help='Количество запросов на шаге rag')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=str, default=None,
+                        help='Путь к JSON-отчёту (по умолчанию benchmarks/results/<commit>.json)')
+    parser.add_argument('--keep-workdir', action='store_true', help='Не удалять временные данные')
+    parser.add_argument('--verbose', action='store_true', help='Не глушить вывод шагов конвейера')
+    args = parser.parse_args(argv)
+
+    stages = [s for s in STAGES if s in args.stages]
+    if 'index' not in stages and 'rag' in stages:
+        parser.error('шаг rag требует шага index')
+    if 'preprocess' not in stages and ('index' in stages or 'rag' in stages):
+        parser.error('шаги index/rag требуют шага preprocess')
+
+    commit = _git_commit()
+    report = {
+        'meta': {
+            'commit': commit,
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'stages': stages,
+            'queries': args.queries,
+            'seed': args.seed,
+        },
+        'runs': [
+            run_size(n, stages, args.queries, args.seed, args.keep_workdir, args.verbose)
+            for n in args.sizes
+        ],
+    }
+
+    output = args.output or os.path.join(BASE_DIR, 'benchmarks', 'results', f"{(commit or 'local')[:12]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n[Bench] Отчёт сохранён: {output}")
+
+
+if __name__ == '__main__':
+    main()
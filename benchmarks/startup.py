@@ -0,0 +1,127 @@
+"""
+Проверка времени запуска CLI по шагам через `python -X importtime`.
+
+Для каждого шага в отдельном интерпретаторе импортируется main.py и то, что нужно
+этому шагу, после чего проверяется:
+  - суммарное время импортов не превышает бюджета шага;
+  - не загружены "чужие" тяжелые модули (например, faiss или langchain для preprocess).
+
+Пример:
+    python -m benchmarks.startup                      # все шаги
+    python -m benchmarks.startup --steps cli preprocess --scale 2
+
+Код возврата 1, если хотя бы один шаг вышел за бюджет или загрузил запрещенный модуль.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+ML_MODULES = ('faiss', 'torch', 'sentence_transformers', 'transformers')
+SCRAPE_MODULES = ('newspaper', 'bs4', 'fake_useragent', 'requests')
+LLM_MODULES = ('langchain', 'langchain_core', 'langchain_huggingface', 'langchain_community')
+
+_PREPROCESS_CODE = """
+import os, shutil, tempfile
+import main
+d = tempfile.mkdtemp()
+try:
+    raw = os.path.join(d, 'raw')
+    os.makedirs(raw)
+    with open(os.path.join(raw, 'a.txt'), 'w', encoding='utf-8') as f:
+        f.write('word ' * 1000)
+    main.step_preprocess(raw, os.path.join(d, 'processed'))
+finally:
+    shutil.rmtree(d)
+"""
+
+# шаг -> (код, бюджет на импорты в мс, запрещенные модули)
+STEPS: Dict[str, Tuple[str, float, Tuple[str, ...]]] = {
+    'cli': ("import main", 150, ML_MODULES + SCRAPE_MODULES + LLM_MODULES + ('dotenv',)),
+    'preprocess': (_PREPROCESS_CODE, 200, ML_MODULES + SCRAPE_MODULES + LLM_MODULES),
+    'scrape': ("import main, scraper.venturebeat, scraper.technologyreview", 3000, ML_MODULES + LLM_MODULES),
+    'index': ("import main, indexing.faiss_indexer", 15000, SCRAPE_MODULES + LLM_MODULES),
+    'rag': ("import main, indexing.faiss_indexer, rag_integration.rag_agent", 20000, ('newspaper', 'fake_useragent')),
+}
+
+
+def parse_importtime(stderr: str) -> Tuple[float, Set[str]]:
+    """
+    Разбирает вывод -X importtime.
+
+    Returns:
+        (суммарное время импортов верхнего уровня в мс, множество загруженных модулей)
+    """
+    total_us = 0
+    modules: Set[str] = set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # строка-заголовок
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        modules.add(stripped)
+        # Верхний уровень — ровно один пробел после '|', вложенные импорты с отступом
+        if len(name) - len(stripped) == 1:
+            total_us += int(parts[1])
+    return total_us / 1000, modules
+
+
+def check_step(step: str, scale: float) -> Dict:
+    code, budget_ms, forbidden = STEPS[step]
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=BASE_DIR, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    import_ms, modules = parse_importtime(proc.stderr)
+    loaded = sorted(m for m in modules if m.split('.')[0] in forbidden)
+    budget_ms *= scale
+
+    problems: List[str] = []
+    if proc.returncode != 0:
+        last_line = [l for l in proc.stderr.splitlines() if not l.startswith('import time:')][-1:]
+        problems.append(f"процесс завершился с кодом {proc.returncode}: {' '.join(last_line)}")
+    if import_ms > budget_ms:
+        problems.append(f"импорты {import_ms:.0f} мс > бюджета {budget_ms:.0f} мс")
+    if loaded:
+        problems.append(f"загружены лишние модули: {', '.join(loaded[:10])}")
+    return {
+        'step': step,
+        'import_ms': import_ms,
+        'budget_ms': budget_ms,
+        'wall_ms': wall_ms,
+        'modules': len(modules),
+        'problems': problems,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Бюджет времени запуска для каждого --step')
+    parser.add_argument('--steps', nargs='+', choices=list(STEPS), default=list(STEPS))
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Множитель бюджетов (например, 2 для медленных CI-машин)')
+    args = parser.parse_args(argv)
+
+    failed = False
+    print(f"{'шаг':<12}{'импорты, мс':>14}{'бюджет, мс':>14}{'процесс, мс':>14}{'модулей':>10}")
+    for step in args.steps:
+        result = check_step(step, args.scale)
+        status = "OK" if not result['problems'] else "FAIL"
+        print(f"{step:<12}{result['import_ms']:>14.1f}{result['budget_ms']:>14.0f}"
+              f"{result['wall_ms']:>14.1f}{result['modules']:>10}  {status}")
+        for problem in result['problems']:
+            print(f"    - {problem}")
+        failed = failed or bool(result['problems'])
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
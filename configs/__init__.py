@@ -0,0 +1,15 @@
+import os
+from functools import lru_cache
+
+from yaml import safe_load
+
+# Корневая директория проекта
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CONFIG_PATH = os.path.join(BASE_DIR, 'configs', 'config.yaml')
+
+
+@lru_cache(maxsize=None)
+def load_config(path: str = CONFIG_PATH) -> dict:
+    """Читает config.yaml один раз за процесс; все модули получают один и тот же словарь."""
+    with open(path, encoding='utf-8') as f:
+        return safe_load(f)
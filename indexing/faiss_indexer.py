@@ -1,8 +1,11 @@
 import faiss
+import logging
 import pickle
 import os
 from sentence_transformers import SentenceTransformer
 
+logger = logging.getLogger(__name__)
+
 class FaissIndexer:
     def __init__(self, model_name: str = 'paraphrase-multilingual-mpnet-base-v2'):
         self.model = SentenceTransformer(model_name)
@@ -12,7 +15,7 @@ class FaissIndexer:
 
     def add_documents(self, docs: list[str]):
         cleaned_docs = [doc.strip() for doc in docs if doc.strip()]
-        print(f"Документов до очистки: {len(docs)} | После очистки: {len(cleaned_docs)}")
+        logger.info("Документов до очистки: %d | После очистки: %d", len(docs), len(cleaned_docs))
         if not cleaned_docs:
             raise ValueError("Нет непустых документов для индексации.")
         embeddings = self.model.encode(cleaned_docs, convert_to_numpy=True)
@@ -32,5 +35,5 @@ class FaissIndexer:
             with open(docs_path, 'rb') as f:
                 self.docs = pickle.load(f)
         else:
-            print(f"[WARN] Не найден файл документов: {docs_path}")
+            logger.warning("Не найден файл документов: %s", docs_path)
             self.docs = []
@@ -1,30 +1,35 @@
 import argparse
+import logging
 import os
-from dotenv import load_dotenv
-from yaml import safe_load
-from scraper.venturebeat import scrape_venturebeat_ai
-from scraper.technologyreview import scrape_technologyreview_ai
-from preprocessing.cleaner import clean_text
-from preprocessing.chunker import chunk_text
-from indexing.faiss_indexer import FaissIndexer
-from rag_integration.rag_agent import RAGAgent
-from sentence_transformers import SentenceTransformer
-
-from dotenv import load_dotenv
-load_dotenv()
-
-# Загрузка конфига
-BASE_DIR = os.path.dirname(__file__)
-with open(os.path.join(BASE_DIR, 'configs/config.yaml'), encoding='utf-8') as f:
-    cfg = safe_load(f)
+from configs import BASE_DIR, load_config
+
+# Тяжелые зависимости (faiss, sentence_transformers, newspaper, langchain) импортируются
+# внутри шагов, чтобы каждый --step загружал только то, что ему нужно.
+
+# Загрузка конфига (общий для всех модулей, читается один раз)
+cfg = load_config()
 
 DATA_RAW = os.path.join(BASE_DIR, 'data/raw')
 DATA_PROC = os.path.join(BASE_DIR, 'data/processed')
 INDEX_PATH = os.path.join(BASE_DIR, 'indexes/faiss.index')
 
+logger = logging.getLogger(__name__)
+
+
+def setup_logging():
+    """Настраивает логирование по observability.log_level из конфига."""
+    level = cfg.get('observability', {}).get('log_level', 'INFO')
+    logging.basicConfig(
+        level=getattr(logging, str(level).upper(), logging.INFO),
+        format='%(asctime)s %(levelname)s [%(name)s] %(message)s',
+    )
+
 
 def step_scrape():
     """Запускает скрейпинг для сайтов, определенных в коде."""
+    from scraper.venturebeat import scrape_venturebeat_ai
+    from scraper.technologyreview import scrape_technologyreview_ai
+
     print("--- Starting Scrape Step ---")
     # Вызываем обновленные функции скрейпинга
     scrape_venturebeat_ai()
@@ -33,58 +38,73 @@ def step_scrape():
     print("--- Scrape Step Finished ---")
 
 
-def step_preprocess():
+def step_preprocess(raw_dir: str = DATA_RAW, proc_dir: str = DATA_PROC):
     """Шаг предобработки: очистка текста и chunking с отладочными сообщениями"""
-    os.makedirs(DATA_PROC, exist_ok=True)
+    from preprocessing.cleaner import clean_text
+    from preprocessing.chunker import chunk_text
+
+    os.makedirs(proc_dir, exist_ok=True)
     total_files = 0
     total_chunks = 0
-    for fname in os.listdir(DATA_RAW):
-        raw_path = os.path.join(DATA_RAW, fname)
+    for fname in os.listdir(raw_dir):
+        raw_path = os.path.join(raw_dir, fname)
         with open(raw_path, encoding='utf-8') as f:
             text = f.read()
         total_files += 1
-        print(f"[DEBUG preprocess] Файл: {fname} | Размер: {len(text)} символов")
+        logger.debug("Файл: %s | Размер: %d символов", fname, len(text))
         clean = clean_text(text)
-        print(f"[DEBUG preprocess] После очистки: {len(clean)} символов")
+        logger.debug("После очистки: %d символов", len(clean))
         chunks = chunk_text(
             clean,
             cfg['rag']['chunk_size'],
             cfg['rag']['chunk_overlap']
         )
         valid_chunks = [c for c in chunks if c.strip()]
-        print(f"[DEBUG preprocess] Генерация чанков: всего {len(chunks)}, валидных {len(valid_chunks)}")
+        logger.debug("Генерация чанков: всего %d, валидных %d", len(chunks), len(valid_chunks))
         for i, chunk in enumerate(valid_chunks):
             total_chunks += 1
             out_fname = f"{os.path.splitext(fname)[0]}_chunk_{i}.txt"
-            out_path = os.path.join(DATA_PROC, out_fname)
+            out_path = os.path.join(proc_dir, out_fname)
             with open(out_path, 'w', encoding='utf-8') as outf:
                 outf.write(chunk)
-    print(f"[INFO preprocess] Всего файлов: {total_files}, сохранено чанков: {total_chunks}")
+    logger.info("Всего файлов: %d, сохранено чанков: %d", total_files, total_chunks)
 
 
-def step_index():
+def step_index(proc_dir: str = DATA_PROC, index_path: str = INDEX_PATH):
+    from indexing.faiss_indexer import FaissIndexer
+
     indexer = FaissIndexer()
     docs = []
-    for fname in os.listdir(DATA_PROC):
-        with open(os.path.join(DATA_PROC, fname), encoding='utf-8') as f:
+    for fname in os.listdir(proc_dir):
+        with open(os.path.join(proc_dir, fname), encoding='utf-8') as f:
             docs.append(f.read())
     indexer.add_documents(docs)
-    os.makedirs(os.path.dirname(INDEX_PATH), exist_ok=True)
-    indexer.save(INDEX_PATH)
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    indexer.save(index_path)
 
 
 def step_rag(query: str):
+    from dotenv import load_dotenv
+    from indexing.faiss_indexer import FaissIndexer
+    from rag_integration.rag_agent import RAGAgent
+    from rag_integration.metrics import metrics_from_config
+
+    load_dotenv()
     indexer = FaissIndexer()
     indexer.load(INDEX_PATH)
-    embed_model = SentenceTransformer(cfg['rag']['embedding_model_name'])
+    obs_cfg = cfg.get('observability', {})
+    metrics = metrics_from_config(obs_cfg, base_dir=BASE_DIR)
     agent = RAGAgent(
     indexer=indexer,
     embed_model_name=cfg['rag']['embedding_model_name'],
     llm_model_name=cfg['rag']['llm_model_name'],
     hf_token=os.getenv("HUGGINGFACEHUB_API_TOKEN"),
-    top_k=cfg['rag']['top_k']
+    top_k=cfg['rag']['top_k'],
+    metrics=metrics
     )
     print(agent.ask(query))
+    if metrics.enabled and obs_cfg.get('metrics_prometheus_path'):
+        metrics.write_prometheus(os.path.join(BASE_DIR, obs_cfg['metrics_prometheus_path']))
 
 
 def main():
@@ -92,6 +112,7 @@ def main():
     parser.add_argument('--step', choices=['scrape','preprocess','index','rag'], required=True)
     parser.add_argument('--query', type=str, help='Вопрос для RAG')
     args = parser.parse_args()
+    setup_logging()
 
     if args.step == 'scrape':
         step_scrape()
@@ -0,0 +1,209 @@
+import contextlib
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Dict, Optional, Sequence, Tuple
+
+# Границы бакетов гистограмм по умолчанию (в секундах для длительностей)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Для размеров (символы контекста, токены промпта)
+SIZE_BUCKETS = (100, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+_LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> _LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: _LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(key) + ([extra] if extra else [])
+    if not items:
+        return ""
+    escaped = (
+        f'{k}="' + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for k, v in items
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class _Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # последний — +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """
+    Лёгкий сборщик метрик для RAG-пайплайна: спаны стадий, гистограммы и счётчики.
+
+    Агрегаты экспортируются в текстовом формате Prometheus (to_prometheus / write_prometheus),
+    а значения по каждому запросу (request()) при заданном jsonl_path дописываются
+    отдельной строкой в JSON-lines файл.
+    """
+
+    enabled = True
+
+    def __init__(self, jsonl_path: Optional[str] = None):
+        self.jsonl_path = jsonl_path
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._histograms: Dict[str, Dict[_LabelKey, _Histogram]] = {}
+        self._counters: Dict[str, Dict[_LabelKey, float]] = {}
+
+    # --- Запись ---
+
+    def observe(self, name: str, value: float, buckets: Sequence[float] = SIZE_BUCKETS, **labels):
+        """Добавляет значение в гистограмму и в запись текущего запроса."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram(buckets)
+            hist.observe(value)
+        record = getattr(self._local, 'record', None)
+        if record is not None:
+            field = name if not labels else f"{name}:{','.join(v for _, v in key)}"
+            record['values'][field] = value
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Увеличивает счётчик."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    @contextlib.contextmanager
+    def span(self, stage: str):
+        """Замеряет длительность стадии в rag_stage_duration_seconds{stage=...}."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            key = _label_key({'stage': stage})
+            with self._lock:
+                series = self._histograms.setdefault('rag_stage_duration_seconds', {})
+                hist = series.get(key)
+                if hist is None:
+                    hist = series[key] = _Histogram(DURATION_BUCKETS)
+                hist.observe(duration)
+            record = getattr(self._local, 'record', None)
+            if record is not None:
+                record['spans'][stage] = duration
+
+    @contextlib.contextmanager
+    def request(self, **attrs):
+        """Собирает спаны и значения одного запроса; на выходе пишет строку в JSON-lines."""
+        record = {
+            'ts': datetime.now(timezone.utc).isoformat(),
+            **attrs,
+            'spans': {},
+            'values': {},
+        }
+        self._local.record = record
+        try:
+            yield record
+        finally:
+            self._local.record = None
+            if self.jsonl_path:
+                self._write_jsonl(record)
+
+    def _write_jsonl(self, record: Dict):
+        line = json.dumps(record, ensure_ascii=False)
+        directory = os.path.dirname(os.path.abspath(self.jsonl_path))
+        os.makedirs(directory, exist_ok=True)
+        with self._lock, open(self.jsonl_path, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+
+    # --- Экспорт ---
+
+    def summary(self) -> Dict[str, Dict]:
+        """Краткая сводка: count/sum/mean по гистограммам и значения счётчиков."""
+        out: Dict[str, Dict] = {}
+        with self._lock:
+            for name, series in self._histograms.items():
+                for key, hist in series.items():
+                    out[name + _format_labels(key)] = {
+                        'count': hist.count,
+                        'sum': hist.sum,
+                        'mean': hist.sum / hist.count if hist.count else None,
+                    }
+            for name, series in self._counters.items():
+                for key, value in series.items():
+                    out[name + _format_labels(key)] = {'value': value}
+        return out
+
+    def to_prometheus(self) -> str:
+        """Сериализует накопленные метрики в текстовый формат экспозиции Prometheus."""
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+            for name in sorted(self._histograms):
+                lines.append(f"# TYPE {name} histogram")
+                for key, hist in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', f'{bound:g}'))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {hist.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {hist.sum:g}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """Пишет метрики в файл (например, для textfile collector node_exporter)."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+class NullMetrics(Metrics):
+    """Выключенная инструментация: все методы — no-op, без блокировок и замеров времени."""
+
+    enabled = False
+
+    def __init__(self):
+        super().__init__(jsonl_path=None)
+
+    def observe(self, name: str, value: float, buckets: Sequence[float] = SIZE_BUCKETS, **labels):
+        pass
+
+    def inc(self, name: str, value: float = 1, **labels):
+        pass
+
+    def span(self, stage: str):
+        return _NULL_CONTEXT
+
+    def request(self, **attrs):
+        return _NULL_CONTEXT
+
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+
+def metrics_from_config(cfg: Optional[Dict], base_dir: str = '') -> Metrics:
+    """Создаёт Metrics по секции observability из config.yaml (NullMetrics, если выключено)."""
+    cfg = cfg or {}
+    if not cfg.get('metrics_enabled', False):
+        return NullMetrics()
+    jsonl_path = cfg.get('metrics_jsonl_path')
+    if jsonl_path:
+        jsonl_path = os.path.join(base_dir, jsonl_path)
+    return Metrics(jsonl_path=jsonl_path)
@@ -1,19 +1,13 @@
 import os
 # Импортируем НОВУЮ функцию из обновленного base_scrape
 from scraper.base_scraper import scrape_articles_from_site
-from yaml import safe_load
+from configs import BASE_DIR, load_config
 
-# Корневая директория проекта
-BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-CONFIG_PATH = os.path.join(BASE_DIR, 'configs', 'config.yaml')
 RAW_DIR = os.path.join(BASE_DIR, 'data', 'raw')
 
-# Чтение конфига
-with open(CONFIG_PATH, encoding='utf-8') as f:
-    cfg = safe_load(f)
-
 def scrape_technologyreview_ai():
     """Скрейпит статьи с MIT Technology Review AI с использованием сайтмапа."""
+    cfg = load_config()
     print("\n--- Starting MIT Technology Review AI Scraping ---")
     # Ищем конфигурацию для Technology Review в YAML
     site_config = next((site for site in cfg.get('scraping', {}).get('sites', []) if site.get('name') == 'MIT Technology Review AI'), None) # Убедись, что 'name' в YAML совпадает
@@ -1,18 +1,12 @@
 import os
 from scraper.base_scraper import scrape_articles_from_site
-from yaml import safe_load
+from configs import BASE_DIR, load_config
 
-# Корневая директория проекта
-BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-CONFIG_PATH = os.path.join(BASE_DIR, 'configs', 'config.yaml')
 RAW_DIR = os.path.join(BASE_DIR, 'data', 'raw')
 
-# Чтение конфига
-with open(CONFIG_PATH, encoding='utf-8') as f:
-    cfg = safe_load(f)
-
 def scrape_venturebeat_ai():
     """Скрейпит статьи с VentureBeat AI с использованием сайтмапа."""
+    cfg = load_config()
     print("\n--- Starting VentureBeat AI Scraping ---")
     # Ищем конфигурацию для VentureBeat в YAML (используем 'name' для поиска)
     site_config = next((site for site in cfg.get('scraping', {}).get('sites', []) if site.get('name') == 'VentureBeat AI'), None)